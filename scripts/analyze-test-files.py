@@ -1,7 +1,11 @@
+import io
 import requests
 import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
-from scipy import signal
+import nifty_ls
+from numba import njit
 from scipy.stats import median_abs_deviation
 
 
@@ -9,38 +13,79 @@ from scipy.stats import median_abs_deviation
 desert_fail_url = "https://hebbkx1anhila5yf.public.blob.vercel-storage.com/Desert_fail_instrumental-Oboo5P3E2iopNkGUGggDqFVOP4LS14.csv"
 desert_success_url = "https://hebbkx1anhila5yf.public.blob.vercel-storage.com/Desert_success_exo-IxZHONyLi22c0KlfybRacLX68vxCRo.csv"
 
-def analyze_lightcurve(url, name):
+# Lomb-Scargle frequency grid, shared by every light curve analyzed
+_LS_FREQS = np.linspace(0.01, 0.5, 1000)
+_LS_PERIODS = 1 / _LS_FREQS
+
+@njit(cache=True)
+def flux_stats(flux):
+    """
+    Single pass over the flux returning its mean, standard deviation, minimum,
+    maximum, and the largest and mean absolute point-to-point change
+    """
+    n = flux.size
+    shift = flux[0]  # Accumulate deviations from the first sample for stability
+    total = 0.0
+    total_sq = 0.0
+    min_flux = flux[0]
+    max_flux = flux[0]
+    max_jump = 0.0
+    total_jump = 0.0
+    for i in range(n):
+        x = flux[i]
+        d = x - shift
+        total += d
+        total_sq += d * d
+        min_flux = min(min_flux, x)
+        max_flux = max(max_flux, x)
+        if i > 0:
+            jump = abs(x - flux[i - 1])
+            max_jump = max(max_jump, jump)
+            total_jump += jump
+    
+    mean_dev = total / n
+    std = np.sqrt(max(total_sq / n - mean_dev * mean_dev, 0.0))
+    return shift + mean_dev, std, min_flux, max_flux, max_jump, total_jump / (n - 1)
+
+def download_lightcurves(urls):
+    """Fetch the raw CSV text of several light curves concurrently"""
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        return list(executor.map(lambda url: requests.get(url).text, urls))
+
+def load_lightcurve(csv_text):
+    """Parse CSV text into contiguous time and flux arrays"""
+    data = pd.read_csv(io.StringIO(csv_text.strip()), usecols=[0, 1], engine='c')
+    
+    # Each column becomes its own contiguous array; rows with a missing or
+    # non-numeric time or flux are skipped, as in RealExoplanetDetector
+    time = pd.to_numeric(data.iloc[:, 0], errors='coerce').to_numpy(dtype=np.float64)
+    flux = pd.to_numeric(data.iloc[:, 1], errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(time) & np.isfinite(flux)
+    return time[valid], flux[valid]
+
+def lombscargle_power(time, flux):
+    """
+    Lomb-Scargle power on the shared frequency grid (NUFFT-backed, O((Nf + Nt) log Nf)).
+    flux may be 2-D, one row per light curve sampled at the same times, in which
+    case all rows are transformed together in one batched NUFFT.
+    """
+    return nifty_ls.lombscargle(
+        time, flux,
+        fmin=_LS_FREQS[0], fmax=_LS_FREQS[-1], Nf=len(_LS_FREQS),
+        normalization='standard'
+    ).power
+
+def analyze_lightcurve(time, flux, name, power=None):
     print(f"\n{'='*60}")
     print(f"Analyzing: {name}")
     print(f"{'='*60}")
     
-    # Download data
-    response = requests.get(url)
-    lines = response.text.strip().split('\n')[1:]  # Skip header
-    
-    time = []
-    flux = []
-    for line in lines:
-        parts = line.split(',')
-        if len(parts) >= 2:
-            try:
-                t = float(parts[0])
-                f = float(parts[1])
-                time.append(t)
-                flux.append(f)
-            except:
-                pass
-    
-    time = np.array(time)
-    flux = np.array(flux)
-    
     print(f"Data points: {len(flux)}")
     print(f"Time span: {time[-1] - time[0]:.2f} days")
     
-    # Basic statistics
-    mean_flux = np.mean(flux)
+    # Basic statistics (one fused pass; median and MAD need their own sort)
+    mean_flux, std_flux, min_raw_flux, _, max_jump, mean_diff = flux_stats(flux)
     median_flux = np.median(flux)
-    std_flux = np.std(flux)
     mad_flux = median_abs_deviation(flux)
     
     print(f"\nFlux Statistics:")
@@ -54,7 +99,7 @@ def analyze_lightcurve(url, name):
     normalized_flux = flux / median_flux
     
     # Transit depth
-    min_flux = np.min(normalized_flux)
+    min_flux = min_raw_flux / median_flux
     transit_depth = 1 - min_flux
     print(f"\nTransit Depth: {transit_depth:.6f} ({transit_depth*100:.4f}%)")
     
@@ -66,9 +111,6 @@ def analyze_lightcurve(url, name):
     
     # Check for instrumental artifacts
     # Look for sudden jumps or ramps
-    diff_flux = np.diff(flux)
-    max_jump = np.max(np.abs(diff_flux))
-    mean_diff = np.mean(np.abs(diff_flux))
     print(f"\nInstrumental Check:")
     print(f"  Max flux jump: {max_jump:.6f}")
     print(f"  Mean flux change: {mean_diff:.6f}")
@@ -80,10 +122,10 @@ def analyze_lightcurve(url, name):
     print(f"  Linear trend slope: {slope:.8f}")
     print(f"  R-squared: {r_value**2:.6f}")
     
-    # Periodicity analysis using Lomb-Scargle
-    frequencies = np.linspace(0.01, 0.5, 1000)
-    periods = 1 / frequencies
-    power = signal.lombscargle(time, normalized_flux - np.mean(normalized_flux), frequencies, normalize=True)
+    # Periodicity analysis using Lomb-Scargle (unless already computed in a batch)
+    periods = _LS_PERIODS
+    if power is None:
+        power = lombscargle_power(time, normalized_flux - mean_flux / median_flux)
     
     best_period_idx = np.argmax(power)
     best_period = periods[best_period_idx]
@@ -96,14 +138,11 @@ def analyze_lightcurve(url, name):
     # Check for secondary eclipse (eclipsing binary indicator)
     if best_period > 0:
         phase = ((time - time[0]) % best_period) / best_period
-        phase_sorted_idx = np.argsort(phase)
-        phase_sorted = phase[phase_sorted_idx]
-        flux_sorted = normalized_flux[phase_sorted_idx]
         
-        # Check around phase 0.5 for secondary eclipse
-        secondary_mask = (phase_sorted > 0.4) & (phase_sorted < 0.6)
-        if np.sum(secondary_mask) > 0:
-            secondary_depth = 1 - np.min(flux_sorted[secondary_mask])
+        # Check around phase 0.5 for secondary eclipse (a filter, no sort needed)
+        secondary_mask = (phase > 0.4) & (phase < 0.6)
+        if secondary_mask.any():
+            secondary_depth = 1 - normalized_flux[secondary_mask].min()
             print(f"  Secondary eclipse depth: {secondary_depth:.6f}")
         
     # Odd-even transit check
@@ -123,9 +162,20 @@ def analyze_lightcurve(url, name):
         'best_power': best_power
     }
 
-# Analyze both files
-fail_data = analyze_lightcurve(desert_fail_url, "Desert_fail_instrumental (SHOULD BE NEGATIVE)")
-success_data = analyze_lightcurve(desert_success_url, "Desert_success_exo (SHOULD BE POSITIVE)")
+# Download both files in parallel, then analyze them
+fail_text, success_text = download_lightcurves([desert_fail_url, desert_success_url])
+fail_time, fail_flux = load_lightcurve(fail_text)
+success_time, success_flux = load_lightcurve(success_text)
+
+# Light curves sampled at the same times share one batched NUFFT; the
+# standard-normalized power does not depend on the flux offset or scale
+if np.array_equal(fail_time, success_time):
+    fail_power, success_power = lombscargle_power(fail_time, np.stack([fail_flux, success_flux]))
+else:
+    fail_power = success_power = None
+
+fail_data = analyze_lightcurve(fail_time, fail_flux, "Desert_fail_instrumental (SHOULD BE NEGATIVE)", fail_power)
+success_data = analyze_lightcurve(success_time, success_flux, "Desert_success_exo (SHOULD BE POSITIVE)", success_power)
 
 print(f"\n{'='*60}")
 print("COMPARISON & DETECTION CRITERIA")
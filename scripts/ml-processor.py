@@ -5,6 +5,10 @@ This script demonstrates how to integrate with the google-research/exoplanet-ml
 
 import numpy as np
 import pandas as pd
+from functools import lru_cache
+from scipy.signal import correlate
+from scipy.special import erfcinv
+from scipy.stats import sigmaclip
 from typing import Dict, List, Tuple, Optional
 import json
 
@@ -14,8 +18,12 @@ class ExoplanetMLProcessor:
     Integrates with google-research/exoplanet-ml models
     """
     
-    def __init__(self):
+    uncertainty_buffer_size = 8192
+    
+    def __init__(self, seed: Optional[int] = None):
         self.model_loaded = False
+        self._rng = np.random.default_rng(seed)
+        self._refill_uncertainty()
         self.preprocessing_params = {
             'normalize': True,
             'detrend': True,
@@ -47,7 +55,7 @@ class ExoplanetMLProcessor:
             data: DataFrame with columns ['time', 'flux', 'flux_err']
             
         Returns:
-            Preprocessed DataFrame
+            Preprocessed DataFrame with columns ['time', 'flux']
         """
         print("🔄 Preprocessing light curve data...")
         
@@ -56,42 +64,50 @@ class ExoplanetMLProcessor:
         if not all(col in data.columns for col in required_cols):
             raise ValueError(f"Data must contain columns: {required_cols}")
         
+        # Work on raw NumPy arrays; a DataFrame is only rebuilt at the end
+        time = data['time'].to_numpy(dtype=np.float64)
+        flux = data['flux'].to_numpy(dtype=np.float64)
+        
         # Remove NaN values
-        data = data.dropna()
+        valid = np.isfinite(time) & np.isfinite(flux)
+        time, flux = time[valid], flux[valid]
         
-        if len(data) < 100:
+        if len(flux) < 100:
             raise ValueError("Insufficient data points (need at least 100)")
         
         # Normalize flux
         if self.preprocessing_params['normalize']:
-            median_flux = data['flux'].median()
-            data['flux'] = data['flux'] / median_flux
+            flux = flux / np.median(flux)
         
-        # Remove outliers (simple sigma clipping)
+        # Remove outliers (iterative sigma clipping). The threshold grows with
+        # the sample size so that ~1 pure-noise point is expected beyond it.
+        # Only bright outliers are clipped so transit dips are never removed
         if self.preprocessing_params['remove_outliers']:
-            flux_std = data['flux'].std()
-            flux_mean = data['flux'].mean()
-            mask = np.abs(data['flux'] - flux_mean) < 3 * flux_std
-            data = data[mask]
+            alpha = np.sqrt(2) * erfcinv(1.0 / len(flux))
+            _, _, upper = sigmaclip(flux, low=np.inf, high=alpha)
+            keep = ~(flux > upper)  # A constant light curve gives a NaN bound; keep it all
+            time, flux = time[keep], flux[keep]
         
-        print(f"✅ Preprocessed {len(data)} data points")
-        return data
+        print(f"✅ Preprocessed {len(flux)} data points")
+        return pd.DataFrame({'time': time, 'flux': flux})
     
     def extract_features(self, data: pd.DataFrame) -> Dict:
         """Extract features from light curve for ML model"""
         print("🔍 Extracting features...")
         
-        time = data['time'].values
-        flux = data['flux'].values
+        time = data['time'].to_numpy()
+        flux = data['flux'].to_numpy()
+        flux_mean = np.mean(flux)
+        flux_std = np.std(flux)
         
         features = {
             'duration': time.max() - time.min(),
-            'num_points': len(data),
-            'flux_mean': np.mean(flux),
-            'flux_std': np.std(flux),
+            'num_points': len(flux),
+            'flux_mean': flux_mean,
+            'flux_std': flux_std,
             'flux_median': np.median(flux),
             'flux_range': np.max(flux) - np.min(flux),
-            'coefficient_of_variation': np.std(flux) / np.mean(flux),
+            'coefficient_of_variation': flux_std / flux_mean,
         }
         
         # Calculate period-related features (simplified)
@@ -112,8 +128,10 @@ class ExoplanetMLProcessor:
         if max_lag < 10:
             return 0.0
         
-        autocorr = np.correlate(flux - np.mean(flux), flux - np.mean(flux), mode='full')
-        autocorr = autocorr[len(autocorr)//2:][:max_lag]
+        # FFT-based autocorrelation (O(N log N)); keep the non-negative lags
+        centered = flux - np.mean(flux)
+        autocorr = correlate(centered, centered, mode='full', method='fft')
+        autocorr = autocorr[len(centered) - 1:len(centered) - 1 + max_lag]
         
         if len(autocorr) > 10:
             peak_idx = np.argmax(autocorr[5:]) + 5  # Skip first few points
@@ -171,6 +189,57 @@ class ExoplanetMLProcessor:
         print(f"✅ Analysis complete: {'Exoplanet detected!' if is_exoplanet else 'No exoplanet detected'}")
         return result
     
+    def predict_batch(self, features_df: pd.DataFrame) -> np.ndarray:
+        """
+        Score many candidates at once with the same rules as _mock_prediction
+        
+        Args:
+            features_df: DataFrame with one row of extract_features() output per candidate
+            
+        Returns:
+            Array of exoplanet probabilities, one per row
+        """
+        period = features_df['estimated_period'].to_numpy()
+        transit_depth = features_df['transit_depth'].to_numpy()
+        cv = features_df['coefficient_of_variation'].to_numpy()
+        
+        # Period analysis (realistic planetary periods)
+        score = np.select(
+            [(0.5 <= period) & (period <= 2.0),  # Hot Jupiters
+             (2.0 <= period) & (period <= 10.0),  # Warm planets
+             (10.0 <= period) & (period <= 50.0),  # Temperate planets
+             (50.0 <= period) & (period <= 100.0)],  # Cold planets
+            [0.4, 0.35, 0.3, 0.25], default=0.0
+        )
+        
+        # Transit depth analysis (realistic planet sizes)
+        score += np.select(
+            [(0.0001 <= transit_depth) & (transit_depth <= 0.001),  # Earth-like
+             (0.001 <= transit_depth) & (transit_depth <= 0.01),  # Neptune-like
+             (0.01 <= transit_depth) & (transit_depth <= 0.1)],  # Jupiter-like
+            [0.3, 0.35, 0.4], default=0.0
+        )
+        
+        # Variability analysis
+        score += np.select(
+            [(0.0005 <= cv) & (cv <= 0.005),  # Optimal variability range
+             cv > 0.01],  # Too much noise
+            [0.2, -0.1], default=0.0
+        )
+        
+        # Signal-to-noise considerations
+        score += 0.1 * (transit_depth / (cv + 1e-10) > 3)
+        
+        # Add controlled randomness for model uncertainty
+        score += self._rng.normal(0, 0.05, len(score))
+        
+        return np.clip(score, 0, 1)
+    
+    def _refill_uncertainty(self):
+        """Pre-draw a block of model-uncertainty samples so predictions skip the RNG"""
+        self._uncertainty = self._rng.normal(0, 0.05, self.uncertainty_buffer_size)
+        self._uncertainty_idx = 0
+    
     def _mock_prediction(self, features: Dict) -> float:
         """Enhanced ML prediction with more sophisticated algorithms"""
         score = 0.0
@@ -210,8 +279,10 @@ class ExoplanetMLProcessor:
             score += 0.1
         
         # Add controlled randomness for model uncertainty
-        uncertainty = np.random.normal(0, 0.05)
-        score += uncertainty
+        if self._uncertainty_idx == self.uncertainty_buffer_size:
+            self._refill_uncertainty()
+        score += self._uncertainty[self._uncertainty_idx]
+        self._uncertainty_idx += 1
         
         return np.clip(score, 0, 1)
     
@@ -228,6 +299,18 @@ class ExoplanetMLProcessor:
         # Clamp to reasonable range
         return np.clip(planet_radius_earth, 0.1, 20.0)
 
+def get_processor(model_path: str = None) -> ExoplanetMLProcessor:
+    """Create and load a processor once per model path, reusing it on later calls"""
+    # Always pass model_path positionally so every spelling of a call shares
+    # one cache entry
+    return _load_processor(model_path)
+
+@lru_cache(maxsize=None)
+def _load_processor(model_path: Optional[str]) -> ExoplanetMLProcessor:
+    processor = ExoplanetMLProcessor()
+    processor.load_model(model_path)
+    return processor
+
 def process_csv_file(file_path: str) -> Dict:
     """
     Process a CSV file for exoplanet detection
@@ -238,8 +321,7 @@ def process_csv_file(file_path: str) -> Dict:
     Returns:
         Analysis results
     """
-    processor = ExoplanetMLProcessor()
-    processor.load_model()
+    processor = get_processor()
     
     try:
         # Load data
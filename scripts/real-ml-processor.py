@@ -1,11 +1,106 @@
+import io
 import numpy as np
 import pandas as pd
 from scipy import signal
 from scipy.optimize import minimize
+from scipy.special import erfcinv
+from numba import njit, prange
 import json
 import sys
 from typing import Dict, List, Tuple, Optional
 
+
+@njit(cache=True, fastmath=True)
+def _phase_window_sums(phase_sorted, csum, csum_sq, lo, hi):
+    """
+    Count, sum and sum of squares of the points with lo < phase < hi for a
+    batch of windows, wrapping a window around phase 0/1 when it extends
+    past either edge.
+    """
+    n = phase_sorted.size
+    wraps = (lo < 0) | (hi > 1)
+    i0 = np.searchsorted(phase_sorted, np.where(lo < 0, lo + 1, lo), side='right')
+    i1 = np.searchsorted(phase_sorted, np.where(hi > 1, hi - 1, hi), side='left')
+    
+    # A wrapped window is the tail [i0, n) plus the head [0, i1)
+    n_in = np.where(wraps, n - i0 + i1, i1 - i0)
+    sum_in = np.where(wraps, csum[n] - csum[i0] + csum[i1], csum[i1] - csum[i0])
+    sum_sq_in = np.where(wraps, csum_sq[n] - csum_sq[i0] + csum_sq[i1], csum_sq[i1] - csum_sq[i0])
+    return n_in, sum_in, sum_sq_in
+
+
+@njit(
+    'Tuple((float64[::1], int64[::1], int64[::1]))'
+    '(float64[::1], float32[::1], float64[::1], float64[::1], float64[::1])',
+    parallel=True, cache=True, fastmath=True
+)
+def _bls_scan(time, flux, periods, duration_fracs, t0_fracs):
+    """
+    Evaluate BLS power over the full (period, duration, t0) grid.
+    Returns the best power per period along with its t0/duration indices.
+    """
+    n = flux.size
+    n_periods = periods.size
+    best_power = np.zeros(n_periods)
+    best_t0_idx = np.zeros(n_periods, dtype=np.int64)
+    best_dur_idx = np.zeros(n_periods, dtype=np.int64)
+    
+    # Work with deviations from the mean to keep the running variance stable
+    mean_flux = 0.0
+    for i in range(n):
+        mean_flux += flux[i]
+    centered = flux - np.float32(mean_flux / n)
+    
+    for p in prange(n_periods):
+        period = periods[p]
+        
+        # Sort the folded light curve once per period; any phase window is
+        # then a contiguous slice whose sums come from the cumulative arrays
+        phase = (time % period) / period
+        order = np.argsort(phase)
+        phase_sorted = phase[order]
+        flux_sorted = centered[order]
+        
+        # Flux is single precision, but the running sums are accumulated in
+        # double precision so small transit depths survive long light curves
+        csum = np.zeros(n + 1)
+        csum_sq = np.zeros(n + 1)
+        for i in range(n):
+            x = np.float64(flux_sorted[i])
+            csum[i + 1] = csum[i] + x
+            csum_sq[i + 1] = csum_sq[i] + x * x
+        total = csum[n]
+        total_sq = csum_sq[n]
+        
+        for d in range(duration_fracs.size):
+            # Evaluate every transit center for this duration at once
+            half_width = duration_fracs[d] / 2
+            n_in, sum_in, sum_sq_in = _phase_window_sums(
+                phase_sorted, csum, csum_sq, t0_fracs - half_width, t0_fracs + half_width
+            )
+            
+            n_out = n - n_in
+            mean_in = sum_in / np.maximum(n_in, 1)
+            mean_out = (total - sum_in) / np.maximum(n_out, 1)
+            var_out = (total_sq - sum_sq_in) / np.maximum(n_out, 1) - mean_out * mean_out
+            
+            # Need at least 3 points in transit and some scatter out of transit
+            valid = (n_in >= 3) & (n_out > 0) & (var_out > 0)
+            power = np.where(
+                valid,
+                (mean_out - mean_in) * np.sqrt(n_in * n_out / n) / np.sqrt(np.where(valid, var_out, 1.0)),
+                0.0
+            )
+            
+            k = np.argmax(power)
+            if power[k] > best_power[p]:
+                best_power[p] = power[k]
+                best_t0_idx[p] = k
+                best_dur_idx[p] = d
+    
+    return best_power, best_t0_idx, best_dur_idx
+
+
 class RealExoplanetDetector:
     """
     Real exoplanet detection algorithms based on NASA's methods:
@@ -18,6 +113,7 @@ class RealExoplanetDetector:
     def __init__(self):
         self.min_period = 0.5  # days
         self.max_period = 50.0  # days
+        self.min_transits = 2  # transits required within the baseline
         self.min_transit_duration = 0.01  # days
         self.detection_threshold = 7.0  # sigma
         
@@ -37,98 +133,84 @@ class RealExoplanetDetector:
         median_flux = np.median(flux)
         flux = flux / median_flux
         
-        # Remove outliers using sigma clipping (3-sigma)
+        # Remove outliers using robust sigma clipping (MAD-based so in-transit
+        # points do not inflate the noise estimate). The threshold solves
+        # erfc(alpha / sqrt(2)) = 1 / N, so ~1 pure-noise point is expected
+        # beyond it regardless of the number of samples. Only the upper tail
+        # is clipped: dimming points may be the transit itself
+        alpha = np.sqrt(2) * erfcinv(1.0 / len(flux))
         flux_median = np.median(flux)
-        flux_std = np.std(flux)
-        outlier_mask = np.abs(flux - flux_median) < 3 * flux_std
+        flux_mad = 1.4826 * np.median(np.abs(flux - flux_median))
+        outlier_mask = flux - flux_median < alpha * flux_mad
+        
+        # Relative flux only needs single precision, which halves its memory
+        # traffic in the BLS search; time stays double for phase accuracy
+        time = np.ascontiguousarray(time[outlier_mask], dtype=np.float64)
+        flux = np.ascontiguousarray(flux[outlier_mask], dtype=np.float32)
         
-        return time[outlier_mask], flux[outlier_mask]
+        return time, flux
     
     def box_least_squares(self, time: np.ndarray, flux: np.ndarray) -> Dict:
         """
         Implement Box Least Squares algorithm for period detection
         Based on Kovács et al. 2002 and used by NASA's TESS pipeline
         """
-        periods = np.logspace(np.log10(self.min_period), np.log10(self.max_period), 1000)
-        best_power = 0
-        best_period = 0
-        best_t0 = 0
-        best_duration = 0
+        # Like astropy's BoxLeastSquares.autoperiod, only search periods that
+        # fit the required number of transits within the observed baseline
+        # (a single transit does not bound the period)
+        max_period = self.max_period
+        if self.min_transits > 1:
+            baseline = time.max() - time.min()
+            max_period = min(max_period, baseline / (self.min_transits - 1))
+        max_period = max(max_period, self.min_period)
         
-        for period in periods:
-            # Phase fold the data
-            phase = ((time % period) / period)
-            
-            # Try different transit durations (1-20% of period)
-            for duration_frac in np.linspace(0.01, 0.2, 20):
-                duration = duration_frac * period
-                
-                # Try different transit centers
-                for t0_frac in np.linspace(0, 1, 50):
-                    # Calculate BLS power
-                    power = self._calculate_bls_power(phase, flux, t0_frac, duration_frac)
-                    
-                    if power > best_power:
-                        best_power = power
-                        best_period = period
-                        best_t0 = t0_frac * period
-                        best_duration = duration
+        duration_fracs = np.linspace(0.01, 0.2, 20)  # 1-20% of period
+        t0_fracs = np.linspace(0, 1, 50)
+        time = np.ascontiguousarray(time, dtype=np.float64)
+        flux = np.ascontiguousarray(flux, dtype=np.float32)
+        
+        periods = np.logspace(np.log10(self.min_period), np.log10(max_period), 1000)
+        powers, t0_idx, dur_idx = _bls_scan(time, flux, periods, duration_fracs, t0_fracs)
         
+        best = np.argmax(powers)
+        if powers[best] <= 0:
+            return {'period': 0, 'power': 0, 't0': 0, 'duration': 0}
+        
+        best_period = periods[best]
         return {
             'period': best_period,
-            'power': best_power,
-            't0': best_t0,
-            'duration': best_duration
+            'power': powers[best],
+            't0': t0_fracs[t0_idx[best]] * best_period,
+            'duration': duration_fracs[dur_idx[best]] * best_period
         }
     
-    def _calculate_bls_power(self, phase: np.ndarray, flux: np.ndarray, 
-                           t0_frac: float, duration_frac: float) -> float:
-        """Calculate BLS power for given parameters"""
-        # Define in-transit and out-of-transit phases
-        transit_mask = np.abs(phase - t0_frac) < duration_frac / 2
-        
-        if np.sum(transit_mask) < 3:  # Need at least 3 points in transit
-            return 0
-        
-        # Calculate mean flux in and out of transit
-        flux_in = np.mean(flux[transit_mask])
-        flux_out = np.mean(flux[~transit_mask])
-        
-        # Calculate BLS power (signal-to-noise ratio)
-        n_in = np.sum(transit_mask)
-        n_out = np.sum(~transit_mask)
-        
-        if n_in == 0 or n_out == 0:
-            return 0
-        
-        # Standard deviation of out-of-transit flux
-        sigma_out = np.std(flux[~transit_mask])
-        
-        if sigma_out == 0:
-            return 0
-        
-        # BLS power calculation
-        power = (flux_out - flux_in) * np.sqrt(n_in * n_out / (n_in + n_out)) / sigma_out
-        
-        return max(0, power)
-    
     def fit_transit_model(self, time: np.ndarray, flux: np.ndarray, 
                          period: float, t0: float, duration: float) -> Dict:
         """
         Fit a simple transit model to the data
         Based on Mandel & Agol 2002 transit model
         """
+        # Work buffers reused by every optimizer evaluation
+        offset = np.empty_like(time)
+        model_flux = np.empty_like(time)
+        residuals = np.empty_like(time)
+        offset_key = [None]
+        
         def transit_model(params):
             depth, period_fit, t0_fit, duration_fit = params
             
-            # Phase fold
-            phase = ((time - t0_fit) % period_fit) / period_fit
-            phase[phase > 0.5] -= 1  # Center around 0
+            # Time since the last mid-transit, only refolded when the
+            # period or epoch actually moved
+            if offset_key[0] != (period_fit, t0_fit):
+                np.subtract(time, t0_fit, out=offset)
+                np.mod(offset, period_fit, out=offset)
+                offset_key[0] = (period_fit, t0_fit)
             
-            # Simple box transit model
-            model_flux = np.ones_like(time)
-            transit_mask = np.abs(phase * period_fit) < duration_fit / 2
-            model_flux[transit_mask] = 1 - depth
+            # Simple box transit model, centered on phase 0
+            half_duration = duration_fit / 2
+            transit_mask = (offset < half_duration) | (offset > period_fit - half_duration)
+            np.copyto(model_flux, 1.0)
+            np.subtract(1.0, depth, out=model_flux, where=transit_mask)
             
             return model_flux
         
@@ -140,8 +222,8 @@ class RealExoplanetDetector:
             if params[3] < self.min_transit_duration or params[3] > params[1] / 2:
                 return 1e10
                 
-            model = transit_model(params)
-            return np.sum((flux - model) ** 2)
+            np.subtract(flux, transit_model(params), out=residuals)
+            return np.dot(residuals, residuals)
         
         # Initial guess
         initial_depth = max(0.001, 1 - np.min(flux))
@@ -149,13 +231,16 @@ class RealExoplanetDetector:
         
         # Fit the model
         try:
-            result = minimize(chi_squared, initial_params, method='Nelder-Mead')
+            result = minimize(
+                chi_squared, initial_params, method='Nelder-Mead',
+                options={'maxiter': 500, 'xatol': 1e-6, 'fatol': 1e-8}
+            )
             fitted_params = result.x
             
             # Calculate goodness of fit
-            model_flux = transit_model(fitted_params)
-            residuals = flux - model_flux
-            chi2 = np.sum(residuals ** 2)
+            fitted_model = transit_model(fitted_params).copy()
+            fit_residuals = flux - fitted_model
+            chi2 = np.sum(fit_residuals ** 2)
             reduced_chi2 = chi2 / (len(flux) - 4)  # 4 parameters
             
             return {
@@ -165,7 +250,7 @@ class RealExoplanetDetector:
                 'duration': fitted_params[3],
                 'chi2': chi2,
                 'reduced_chi2': reduced_chi2,
-                'model_flux': model_flux.tolist()
+                'model_flux': fitted_model.tolist()
             }
         except:
             return None
@@ -230,27 +315,19 @@ class RealExoplanetDetector:
         """
         try:
             # Parse CSV data
-            lines = csv_data.strip().split('\n')
-            header = lines[0].lower()
+            header = csv_data.strip().split('\n', 1)[0].lower()
             
             # Detect column format
             if 'time' in header and 'flux' in header:
-                data = []
-                for line in lines[1:]:
-                    parts = line.split(',')
-                    if len(parts) >= 2:
-                        try:
-                            time_val = float(parts[0])
-                            flux_val = float(parts[1])
-                            data.append([time_val, flux_val])
-                        except ValueError:
-                            continue
+                data = pd.read_csv(io.StringIO(csv_data.strip()), usecols=[0, 1], engine='c')
                 
-                if len(data) < 100:
-                    return {'error': 'Insufficient data points. Need at least 100 measurements.'}
+                # Pull each column straight into its own float64 array;
+                # non-numeric entries become NaN and are dropped in preprocessing
+                time = pd.to_numeric(data.iloc[:, 0], errors='coerce').to_numpy(dtype=np.float64)
+                flux = pd.to_numeric(data.iloc[:, 1], errors='coerce').to_numpy(dtype=np.float64)
                 
-                data = np.array(data)
-                time, flux = data[:, 0], data[:, 1]
+                if np.count_nonzero(np.isfinite(time) & np.isfinite(flux)) < 100:
+                    return {'error': 'Insufficient data points. Need at least 100 measurements.'}
             else:
                 return {'error': 'CSV must contain "time" and "flux" columns'}
             
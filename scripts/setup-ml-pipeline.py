@@ -21,15 +21,21 @@ def setup_ml_environment():
         'matplotlib',
         'astropy',  # For astronomical data handling
         'lightkurve',  # For Kepler/TESS data processing
+        'nifty-ls',  # For NUFFT-based Lomb-Scargle periodograms
+        'numba',  # For compiled BLS search kernels
     ]
     
     print("📦 Installing required packages...")
-    for package in required_packages:
-        try:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-            print(f"✅ Installed {package}")
-        except subprocess.CalledProcessError:
-            print(f"❌ Failed to install {package}")
+    # One pip invocation resolves all packages together
+    try:
+        subprocess.check_call([
+            sys.executable, '-m', 'pip', 'install',
+            '--no-input', '--upgrade-strategy', 'only-if-needed',
+            *required_packages
+        ])
+        print(f"✅ Installed {', '.join(required_packages)}")
+    except subprocess.CalledProcessError:
+        print(f"❌ Failed to install {', '.join(required_packages)}")
     
     # Create directories for ML models and data
     directories = [